@@ -13,12 +13,20 @@ import time
 # 每个数据包的最大大小8192个字节=8KB
 SAFE_CHUNK_SIZE=8192
 
-# 协议设计如下：
-# b'\x01' - 开始包: [类型0x01 (1字节)] + [总包数 (2字节)]
-# b'\x02' - 结束包: [类型0x02 (1字节)]
-# b'\x00' - 数据包: [类型0x00 (1字节)] + [包序号 (2字节)] + [数据内容]
+# 通道号：同一个UDP端口上复用多路图像流
+FULL_FRAME_CHANNEL = 0  # 完整画面（低质量）
+FOCUS_CHANNEL = 1       # 选中物体周围的裁剪画面（高质量）
 
-def send_image(image_rgb, host, port):
+# 各通道默认的JPEG压缩质量
+FULL_FRAME_QUALITY = 10
+FOCUS_QUALITY = 70
+
+# 协议设计如下（每个包的第2个字节都是通道号）：
+# b'\x01' - 开始包: [类型0x01 (1字节)] + [通道号 (1字节)] + [总包数 (2字节)]
+# b'\x02' - 结束包: [类型0x02 (1字节)] + [通道号 (1字节)]
+# b'\x00' - 数据包: [类型0x00 (1字节)] + [通道号 (1字节)] + [包序号 (2字节)] + [数据内容]
+
+def send_image(image_rgb, host, port, quality=FULL_FRAME_QUALITY, channel=FULL_FRAME_CHANNEL, chunk_size=SAFE_CHUNK_SIZE):
     """
     压缩、分割并发送图像。
 
@@ -26,6 +34,9 @@ def send_image(image_rgb, host, port):
         image_rgb (np.array): 从cv2.imread()或Realsense获取的原始RGB图像 (NumPy array)。
         host (str): 目标主机的IP地址 (例如 '192.168.1.100' 或 HoloLens的IP)。
         port (int): 目标主机的端口号。
+        quality (int): JPEG压缩质量 (0-100)。
+        channel (int): 通道号 (0-255)，接收端据此把数据包分到不同的画面。
+        chunk_size (int): 每个数据包的最大字节数（含4字节包头）。
     """
 
     # 在函数内部创建socket可以确保每次调用都是全新的，避免了之前未关闭的socket的干扰
@@ -33,43 +44,45 @@ def send_image(image_rgb, host, port):
         try:
             # 1. 图像压缩
             # 原始像素矩阵变成符合JPEG格式的字节
-            encode_param = [int(cv2.IMWRITE_JPEG_QUALITY), 10]
+            encode_param = [int(cv2.IMWRITE_JPEG_QUALITY), quality]
             _, img_encoded = cv2.imencode('.jpg', image_rgb, encode_param)
-            
+
             # 从一个装着字节的NumPy容器对象中，提取出纯粹的字节序列
             img_bytes = img_encoded.tobytes()
-            
+
             # 2. 数据分割
             size = len(img_bytes)
-            max_data_size = SAFE_CHUNK_SIZE - 3 # 减去1字节标志+两个字节的包序号
+            max_data_size = chunk_size - 4 # 减去1字节标志+1字节通道号+两个字节的包序号
             num_packets = (size + max_data_size - 1) // max_data_size
 
-                        
-            if num_packets > 65535: # 2^16-1 = 65535 
+
+            if num_packets > 65535: # 2^16-1 = 65535
                 print("错误：图像太大，分割后的包数超过65535！")
                 return
 
+            channel_byte = channel.to_bytes(1, 'big')
+
             # 发送一个“开始”信号，包含总包数
-            # 格式: b'\x01' (开始标志) + [包总数 (2字节)]
-            start_packet = b'\x01' + num_packets.to_bytes(2, 'big') # 大端字节序列
+            # 格式: b'\x01' (开始标志) + [通道号 (1字节)] + [包总数 (2字节)]
+            start_packet = b'\x01' + channel_byte + num_packets.to_bytes(2, 'big') # 大端字节序列
             sock.sendto(start_packet, (host, port))
-            
+
             # 循环发送每一个数据块
             for i in range(num_packets):
                 start = i * max_data_size
                 end = start + max_data_size
-                
-                # [0x00 数据标志(1字节)] + [包序号 (2字节)] + [数据内容]
-                packet = b'\x00' +  i.to_bytes(2, 'big') + img_bytes[start:end]
-                
+
+                # [0x00 数据标志(1字节)] + [通道号 (1字节)] + [包序号 (2字节)] + [数据内容]
+                packet = b'\x00' + channel_byte + i.to_bytes(2, 'big') + img_bytes[start:end]
+
                 # 发送数据
                 sock.sendto(packet, (host, port))
                 # 短暂延时，防止接收端缓冲区溢出，这里很重要！！！
-                time.sleep(0.0001) 
+                time.sleep(0.0001)
 
             # 发送一个“结束”信号
-            # 格式: b'\x02' (结束标志)
-            end_packet = b'\x02'
+            # 格式: b'\x02' (结束标志) + [通道号 (1字节)]
+            end_packet = b'\x02' + channel_byte
             sock.sendto(end_packet, (host, port))
 
             # print(f"图像已发送，大小: {size} 字节, 分为 {num_packets} 个包。")
@@ -81,6 +94,49 @@ def send_image(image_rgb, host, port):
             sock.close()
 
 
+def crop_around_box(image_rgb, box, margin=0.25):
+    """
+    以物体的边界框为中心，向外扩展一圈后裁剪图像。
+
+    Args:
+        image_rgb (np.array): 原始图像。
+        box (list): 物体边界框 [x1, y1, x2, y2]，单位为像素。
+        margin (float): 向外扩展的比例，0.25 表示四周各扩展框宽/高的25%。
+
+    Returns:
+        np.array | None: 裁剪后的图像；边界框无效时返回 None。
+    """
+    height, width = image_rgb.shape[:2]
+    x1, y1, x2, y2 = map(int, box)
+    pad_x = int((x2 - x1) * margin)
+    pad_y = int((y2 - y1) * margin)
+
+    # 限制在图像范围内
+    x1, y1 = max(0, x1 - pad_x), max(0, y1 - pad_y)
+    x2, y2 = min(width, x2 + pad_x), min(height, y2 + pad_y)
+    if x2 <= x1 or y2 <= y1:
+        return None
+    return image_rgb[y1:y2, x1:x2]
+
+
+def send_focus_crop(image_rgb, box, host, port, quality=FOCUS_QUALITY, chunk_size=SAFE_CHUNK_SIZE):
+    """
+    在 FOCUS_CHANNEL 上以较高质量发送选中物体周围的裁剪画面。
+
+    Args:
+        image_rgb (np.array): 原始图像。
+        box (list): 选中物体的边界框 [x1, y1, x2, y2]。
+        host (str): 目标主机的IP地址。
+        port (int): 目标主机的端口号。
+        quality (int): JPEG压缩质量 (0-100)。
+        chunk_size (int): 每个数据包的最大字节数（含4字节包头）。
+    """
+    crop = crop_around_box(image_rgb, box)
+    if crop is None:
+        return
+    send_image(crop, host, port, quality=quality, channel=FOCUS_CHANNEL, chunk_size=chunk_size)
+
+
 if __name__ == '__main__':
     HOLOLENS_IP = "127.0.0.1"  # 测试时用本地地址，实际使用时换成HoloLens的IP
     UDP_PORT = 9999
@@ -88,19 +144,19 @@ if __name__ == '__main__':
     # 用示例图片代替相机实时画面
     try:
         # 加载一张测试图片
-        test_image = cv2.imread('test.jpg') 
+        test_image = cv2.imread('test.jpg')
         if test_image is None:
             # 如果没有图片，创建一个黑色的图片用于测试
             print("未找到 'test.jpg'，将创建一个黑色图像用于测试。")
             test_image = np.zeros((480, 640, 3), dtype=np.uint8)
 
         print(f"开始向 {HOLOLENS_IP}:{UDP_PORT} 发送图像...")
-        
+
         # 模拟视频流，持续发送
         while True:
             send_image(test_image, HOLOLENS_IP, UDP_PORT)
             # 控制发送帧率，例如每秒发送30帧
-            time.sleep(1/30) 
+            time.sleep(1/30)
 
     except KeyboardInterrupt:
         print("\n程序已停止。")
\ No newline at end of file
@@ -0,0 +1,228 @@
+# config.py
+
+import copy
+import json
+import os
+import time
+
+#################################################
+# 服务器配置
+# 优先级：默认值 < 性能档位(profile) < 配置文件(YAML/TOML) < 命令行参数
+#################################################
+
+DEFAULT_CONFIG = {
+    "network": {
+        "unity_ip": "127.0.0.1",
+        "udp_port": 9999,
+        "tcp_port": 9998,
+    },
+    "camera": {
+        "width": 640,
+        "height": 480,
+        "fps": 30,
+    },
+    "stream": {
+        "chunk_size": 8192,                 # 每个UDP数据包的最大字节数
+        "full_frame_quality": 10,           # 完整画面的JPEG质量
+        "focus_quality": 70,                # 选中物体裁剪画面的JPEG质量
+        "background_frame_interval": 3,     # 选中物体后，完整画面每隔多少帧发送一次
+    },
+    "detection": {
+        "model_path": "assets/yolo11n.pt",
+        "imgsz": 640,                       # 推理尺寸
+        "stride": 1,                        # 每隔多少帧做一次检测
+        "move_threshold": 5.0,              # 物体移动超过多少像素才发送更新
+        "model_cache_dir": "assets/cache",  # 预处理模型的缓存目录，为空时不缓存
+    },
+    "grid": {
+        "rows": 3,
+        "cols": 3,
+        "mask_occupied": True,              # 屏蔽被已检测物体占用的单元
+        "mask_invalid_depth": True,         # 屏蔽没有有效深度的单元（需要对齐深度图）
+    },
+}
+
+# 性能档位：同时调整画面分辨率、相机帧率、推理尺寸、检测间隔和分包大小
+PROFILES = {
+    "low-latency": {
+        "camera": {"width": 640, "height": 480, "fps": 60},
+        "stream": {"chunk_size": 8192},
+        "detection": {"imgsz": 320, "stride": 1},
+    },
+    "low-bandwidth": {
+        "camera": {"width": 424, "height": 240, "fps": 15},
+        "stream": {"chunk_size": 1400, "full_frame_quality": 8, "background_frame_interval": 6},
+        "detection": {"imgsz": 320, "stride": 2},
+    },
+    "max-accuracy": {
+        "camera": {"width": 1280, "height": 720, "fps": 30},
+        "stream": {"chunk_size": 8192, "focus_quality": 90},
+        "detection": {"imgsz": 1280, "stride": 1},
+    },
+}
+
+# RealSense D400 系列彩色流与深度流都支持的 (宽, 高) -> 帧率
+# 90 FPS 只有深度流支持，彩色流最高 60 FPS，因此不在表中
+SUPPORTED_CAMERA_MODES = {
+    (424, 240): (6, 15, 30, 60),
+    (640, 480): (6, 15, 30, 60),
+    (848, 480): (6, 15, 30, 60),
+    (1280, 720): (6, 15, 30),
+}
+
+# UDP负载上限为65507字节，数据包头占4字节
+MAX_CHUNK_SIZE = 65507
+# 分包过小时一帧会被拆成成百上千个包，开销主要花在包头和系统调用上；
+# 512 字节略低于 IPv4 保证可达的最小数据报 576 字节减去 IP/UDP 头
+MIN_CHUNK_SIZE = 512
+
+
+def _check_type(name, value, default):
+    """检查配置值的类型与默认值一致（浮点项也接受整数），不一致时报错"""
+    if isinstance(default, bool):
+        ok = isinstance(value, bool)
+    elif isinstance(default, float):
+        ok = isinstance(value, (int, float)) and not isinstance(value, bool)
+    elif isinstance(default, int):
+        ok = isinstance(value, int) and not isinstance(value, bool)
+    else:
+        ok = isinstance(value, type(default))
+    if not ok:
+        raise ValueError(f"配置项 '{name}' 的类型应为 {type(default).__name__}: {value!r}")
+
+
+def _merge(base, override):
+    """把 override 中的值逐节合并到 base 中，遇到未知的节/键或类型错误时报错"""
+    if not isinstance(override, dict):
+        raise ValueError(f"配置内容必须是键值表: {override!r}")
+    for section, values in override.items():
+        if section not in base:
+            raise ValueError(f"未知的配置节: '{section}'")
+        if not isinstance(values, dict):
+            raise ValueError(f"配置节 '{section}' 必须是键值表: {values!r}")
+        for key, value in values.items():
+            if key not in base[section]:
+                raise ValueError(f"未知的配置项: '{section}.{key}'")
+            _check_type(f"{section}.{key}", value, base[section][key])
+            base[section][key] = value
+
+
+def read_config_file(path):
+    """读取 YAML (.yaml/.yml) 或 TOML (.toml) 配置文件，返回字典"""
+    ext = os.path.splitext(path)[1].lower()
+    if ext == ".toml":
+        import tomllib
+        with open(path, "rb") as f:
+            try:
+                return tomllib.load(f)
+            except tomllib.TOMLDecodeError as e:
+                raise ValueError(f"TOML配置文件解析失败: {e}")
+    if ext in (".yaml", ".yml"):
+        try:
+            import yaml
+        except ImportError:
+            raise ImportError("读取YAML配置需要安装 PyYAML: pip install pyyaml")
+        with open(path, "r", encoding="utf-8") as f:
+            try:
+                return yaml.safe_load(f) or {}
+            except yaml.YAMLError as e:
+                raise ValueError(f"YAML配置文件解析失败: {e}")
+    raise ValueError(f"不支持的配置文件格式: '{path}'，请使用 .yaml/.yml 或 .toml")
+
+
+def build_config(config_path=None, profile=None, overrides=None):
+    """
+    按优先级合并出最终生效的配置并校验。
+
+    Args:
+        config_path (str | None): 配置文件路径，文件中可以用顶层的 profile 键指定档位。
+        profile (str | None): 性能档位名称，优先于配置文件中的 profile。
+        overrides (dict | None): 命令行参数等最高优先级的覆盖值，格式同 DEFAULT_CONFIG。
+
+    Returns:
+        dict: 生效的配置，包含 "profile" 键。
+    """
+    file_config = read_config_file(config_path) if config_path else {}
+    if not isinstance(file_config, dict):
+        raise ValueError(f"配置文件的顶层必须是键值表: '{config_path}'")
+    file_profile = file_config.pop("profile", None)
+    if file_profile is not None and not isinstance(file_profile, str):
+        raise ValueError(f"配置文件中的 profile 必须是字符串: {file_profile!r}")
+    profile = profile or file_profile
+
+    config = copy.deepcopy(DEFAULT_CONFIG)
+    if profile:
+        if profile not in PROFILES:
+            raise ValueError(f"未知的性能档位: '{profile}'，可选: {', '.join(PROFILES)}")
+        _merge(config, PROFILES[profile])
+    _merge(config, file_config)
+    _merge(config, overrides or {})
+
+    validate_config(config)
+    config["profile"] = profile
+    return config
+
+
+def validate_config(config):
+    """检查参数组合是否合法，不合法时抛出 ValueError"""
+    camera = config["camera"]
+    mode = (camera["width"], camera["height"])
+    if mode not in SUPPORTED_CAMERA_MODES:
+        supported = ", ".join(f"{w}x{h}" for w, h in SUPPORTED_CAMERA_MODES)
+        raise ValueError(f"相机不支持分辨率 {mode[0]}x{mode[1]}，可选: {supported}")
+    if camera["fps"] not in SUPPORTED_CAMERA_MODES[mode]:
+        raise ValueError(f"相机在 {mode[0]}x{mode[1]} 下不支持 {camera['fps']} FPS，可选: {SUPPORTED_CAMERA_MODES[mode]}")
+
+    stream = config["stream"]
+    if not MIN_CHUNK_SIZE <= stream["chunk_size"] <= MAX_CHUNK_SIZE:
+        raise ValueError(f"chunk_size 必须在 {MIN_CHUNK_SIZE} 到 {MAX_CHUNK_SIZE} 之间: {stream['chunk_size']}")
+    for key in ("full_frame_quality", "focus_quality"):
+        if not 0 <= stream[key] <= 100:
+            raise ValueError(f"{key} 必须在 0 到 100 之间: {stream[key]}")
+    if stream["background_frame_interval"] < 1:
+        raise ValueError("background_frame_interval 必须至少为 1")
+
+    detection = config["detection"]
+    if detection["imgsz"] < 32 or detection["imgsz"] % 32 != 0:
+        raise ValueError(f"imgsz 必须是32的正整数倍: {detection['imgsz']}")
+    if detection["stride"] < 1:
+        raise ValueError("detection.stride 必须至少为 1")
+
+    grid = config["grid"]
+    if grid["rows"] < 1 or grid["cols"] < 1:
+        raise ValueError(f"网格行列数必须为正数: {grid['rows']}x{grid['cols']}")
+
+
+def write_effective_config(config, run_dir="runs", config_path=None, argv=None):
+    """
+    把本次运行生效的配置写入 run_dir，便于复现基准测试。
+
+    Args:
+        config (dict): build_config() 的返回值。
+        run_dir (str): 输出目录。
+        config_path (str | None): 生成该配置所用的配置文件路径。
+        argv (list | None): 启动时的命令行参数。
+
+    Returns:
+        str: 写入的文件路径。文件名包含毫秒和进程号，重名时追加序号，不会覆盖已有的记录。
+    """
+    os.makedirs(run_dir, exist_ok=True)
+    now = time.time()
+    stamp = time.strftime('%Y%m%d_%H%M%S', time.localtime(now)) + f"_{int(now * 1000) % 1000:03d}"
+    record = {
+        "started_at": time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(now)),
+        "config_path": config_path,
+        "argv": argv,
+        "config": config,
+    }
+    # "x" 模式：文件已存在时报错而不是覆盖，此时在文件名后加序号重试
+    base = os.path.join(run_dir, f"config_{stamp}_{os.getpid()}")
+    suffix = 0
+    while True:
+        path = f"{base}.json" if suffix == 0 else f"{base}_{suffix}.json"
+        try:
+            with open(path, "x", encoding="utf-8") as f:
+                json.dump(record, f, indent=2, ensure_ascii=False)
+            return path
+        except FileExistsError:
+            suffix += 1
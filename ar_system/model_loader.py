@@ -0,0 +1,150 @@
+# model_loader.py
+
+import hashlib
+import json
+import os
+import shutil
+import threading
+import time
+
+import numpy as np
+
+#################################################
+# YOLO模型后台加载
+# ultralytics/torch 的导入和模型加载要花好几秒，放到后台线程中，
+# 让相机和TCP服务先启动，视频流不必等待模型
+#
+# 预处理后的模型（融合好网络层、固定推理尺寸的TorchScript）缓存在磁盘上，
+# 按 (权重路径, 权重修改时间, 推理尺寸, 设备, ultralytics版本) 区分，
+# 下次启动直接加载缓存，不必再从 .pt 权重重新构建
+#################################################
+
+# 未指定推理尺寸时 ultralytics 使用的默认值
+DEFAULT_IMGSZ = 640
+
+
+def cache_key(model_path, imgsz, device, version=""):
+    """根据权重文件及其修改时间、推理尺寸、设备和ultralytics版本生成缓存键"""
+    stat = os.stat(model_path)
+    raw = json.dumps([os.path.abspath(model_path), stat.st_mtime_ns, imgsz, device, version])
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()[:16]
+
+
+def cached_model_path(cache_dir, model_path, imgsz, device, version=""):
+    """返回缓存的预处理模型文件路径（文件不一定存在）"""
+    name = os.path.splitext(os.path.basename(model_path))[0]
+    return os.path.join(cache_dir, f"{name}_{cache_key(model_path, imgsz, device, version)}.torchscript")
+
+
+class ModelLoader:
+    def __init__(self, model_path, warmup_size=(480, 640), imgsz=None, cache_dir=None, device=None):
+        self.model_path = model_path
+        self.warmup_size = warmup_size
+        self.imgsz = imgsz
+        self.cache_dir = cache_dir  # 为None或空字符串时不使用磁盘缓存
+        self.device = device        # 为None时自动选择: 有CUDA用cuda:0，否则用cpu
+        self.model = None
+        self.error = None
+        self.load_time = None
+        self.cache_hit = None       # True: 从缓存加载; False: 从权重加载; None: 未使用缓存
+        self.ready = threading.Event()  # 加载完成（无论成功还是失败）后置位
+        self.cache_saved = threading.Event()  # 缓存写入结束（或无需写入）后置位
+        self.load_thread = threading.Thread(target=self._load)
+        self.load_thread.daemon = True
+
+    def start(self):
+        """在后台线程中开始加载模型"""
+        self.load_thread.start()
+        return self
+
+    def _warmup(self, model, imgsz, device):
+        """第一次推理会分配显存、初始化预测器，提前做掉，避免第一帧卡顿"""
+        model.predict(np.zeros((*self.warmup_size, 3), dtype=np.uint8), imgsz=imgsz, device=device, verbose=False)
+
+    def _load(self):
+        """导入ultralytics，优先加载缓存的预处理模型，没有缓存时加载权重并预热"""
+        start_time = time.time()
+        artifact = None
+        try:
+            # 延迟导入：ultralytics 会连带导入 torch，是启动时最慢的部分
+            import torch
+            import ultralytics
+            from ultralytics import YOLO
+
+            device = self.device or ("cuda:0" if torch.cuda.is_available() else "cpu")
+            imgsz = self.imgsz or DEFAULT_IMGSZ
+            if self.cache_dir:
+                artifact = cached_model_path(self.cache_dir, self.model_path, imgsz, device, ultralytics.__version__)
+
+            model = None
+            if artifact and os.path.exists(artifact):
+                try:
+                    model = YOLO(artifact, task="detect")
+                    self._warmup(model, imgsz, device)
+                    self.cache_hit = True
+                except Exception as e:
+                    print(f"缓存的模型 '{artifact}' 无法使用，将重新生成。错误: {e}")
+                    os.remove(artifact)
+                    model = None
+
+            if model is None:
+                model = YOLO(self.model_path)
+                self._warmup(model, imgsz, device)
+                self.cache_hit = False if artifact else None
+
+            self.model = model
+            self.device = device
+            self.load_time = time.time() - start_time
+            source = {True: "缓存命中", False: "缓存未命中", None: "未使用缓存"}[self.cache_hit]
+            print(f"YOLO模型 '{self.model_path}' 已加载（{source}），耗时 {self.load_time:.2f} 秒。")
+        except Exception as e:
+            self.error = e
+            print(f"加载YOLO模型失败，请检查网络连接或文件路径。错误: {e}")
+        finally:
+            self.ready.set()
+
+        # 模型已经可用，再在后台生成缓存，不耽误本次启动
+        try:
+            if self.cache_hit is False:
+                self._save_artifact(artifact, self.imgsz or DEFAULT_IMGSZ, self.device)
+        finally:
+            self.cache_saved.set()
+
+    def _save_artifact(self, artifact, imgsz, device):
+        """把权重导出为固定推理尺寸的TorchScript，存入缓存目录"""
+        try:
+            from ultralytics import YOLO
+
+            os.makedirs(self.cache_dir, exist_ok=True)
+            # 使用单独的模型实例导出，不影响主循环正在使用的模型
+            exported = YOLO(self.model_path).export(format="torchscript", imgsz=imgsz, device=device)
+            shutil.move(exported, artifact)
+            print(f"已缓存预处理后的模型: {artifact}")
+        except Exception as e:
+            print(f"缓存模型失败（不影响本次运行）: {e}")
+
+    def get(self):
+        """模型已就绪时返回模型，否则返回None，不会阻塞"""
+        return self.model if self.ready.is_set() else None
+
+    def wait(self, timeout=None):
+        """阻塞直到模型加载完成，返回模型（失败时为None）"""
+        self.ready.wait(timeout)
+        return self.get()
+
+
+def load_model_async(model_path, warmup_size=(480, 640), imgsz=None, cache_dir=None, device=None):
+    """
+    创建并启动一个后台加载器。
+
+    Args:
+        model_path (str): YOLO权重文件路径。
+        warmup_size (tuple): 预热时使用的图像尺寸 (高, 宽)，应与相机分辨率一致。
+        imgsz (int | None): 推理尺寸，应与主循环中 model.track 使用的一致。
+        cache_dir (str | None): 预处理模型的磁盘缓存目录，为空时不使用缓存。
+        device (str | None): 推理设备，例如 'cpu' 或 'cuda:0'，为None时自动选择。
+
+    Returns:
+        ModelLoader: 后台加载器。
+    """
+    return ModelLoader(model_path, warmup_size, imgsz, cache_dir, device).start()
@@ -0,0 +1,99 @@
+# target_grid.py
+
+from collections import namedtuple
+from functools import lru_cache
+
+import numpy as np
+
+#################################################
+# 移动目标点网格
+# 网格几何按 (分辨率, 行数, 列数) 只计算一次并缓存，
+# 每次"move"指令只需要在缓存的网格上做遮挡/深度筛选
+#################################################
+
+# 网格单元中有效深度像素所占比例的最低要求
+MIN_VALID_DEPTH_RATIO = 0.5
+# 检查深度时的采样步长，避免逐像素遍历
+DEPTH_SAMPLE_STRIDE = 4
+
+# 网格单元。缓存中的网格会被所有调用者共享，因此单元及其坐标都是不可变的元组
+# id: 行优先编号；pos: 中心点 (x, y)；rect: 区域 (x1, y1, x2, y2)
+GridCell = namedtuple("GridCell", ["id", "pos", "rect"])
+
+
+@lru_cache(maxsize=None)
+def build_grid(width, height, rows=3, cols=3):
+    """
+    生成 rows x cols 网格中每个单元的几何信息。
+
+    Args:
+        width (int): 图像宽度（像素）。
+        height (int): 图像高度（像素）。
+        rows (int): 行数。
+        cols (int): 列数。
+
+    Returns:
+        tuple: 由 GridCell 组成，id 按行优先编号，因此可以直接用 id 索引。
+    """
+    if rows < 1 or cols < 1:
+        raise ValueError(f"网格行列数必须为正数: {rows}x{cols}")
+
+    cells = []
+    for i in range(rows):  # 代表行 (y)
+        for j in range(cols):  # 代表列 (x)
+            x1, x2 = width * j // cols, width * (j + 1) // cols
+            y1, y2 = height * i // rows, height * (i + 1) // rows
+            cells.append(GridCell(
+                id=i * cols + j,
+                pos=(int(width * (2 * j + 1) / (2 * cols)), int(height * (2 * i + 1) / (2 * rows))),
+                rect=(x1, y1, x2, y2),
+            ))
+    return tuple(cells)
+
+
+def is_cell_occupied(cell, boxes):
+    """单元中心点落在任意一个物体边界框 [x1, y1, x2, y2] 内时视为被占用。"""
+    x, y = cell.pos
+    return any(x1 <= x <= x2 and y1 <= y <= y2 for x1, y1, x2, y2 in boxes)
+
+
+def has_valid_depth(cell, depth_image, min_ratio=MIN_VALID_DEPTH_RATIO):
+    """单元内（按步长采样）非零深度像素的比例不低于 min_ratio 时视为深度有效。"""
+    x1, y1, x2, y2 = cell.rect
+    samples = depth_image[y1:y2:DEPTH_SAMPLE_STRIDE, x1:x2:DEPTH_SAMPLE_STRIDE]
+    if samples.size == 0:
+        return False
+    return np.count_nonzero(samples) / samples.size >= min_ratio
+
+
+def select_targets(grid, occupied_boxes=None, depth_image=None):
+    """
+    从缓存的网格中筛选出可用的移动目标。
+
+    Args:
+        grid (tuple): build_grid() 的返回值。
+        occupied_boxes (list | None): 已检测到的物体边界框，落在框内的单元被屏蔽。
+        depth_image (np.array | None): 与彩色图对齐的深度图，深度无效的单元被屏蔽。
+
+    Returns:
+        list: 可用的单元（保留原始 id）。
+    """
+    targets = []
+    for cell in grid:
+        if occupied_boxes and is_cell_occupied(cell, occupied_boxes):
+            continue
+        if depth_image is not None and not has_valid_depth(cell, depth_image):
+            continue
+        targets.append(cell)
+    return targets
+
+
+def build_point_list_message(targets, rows, cols):
+    """
+    构建一次性发送给Unity的 point_list 消息，包含网格尺寸和所有可用单元的几何信息。
+    """
+    return {
+        "rows": rows,
+        "cols": cols,
+        "points": [{"id": cell.id, "pos": list(cell.pos), "rect": list(cell.rect)} for cell in targets],
+    }
@@ -4,13 +4,17 @@ import pyrealsense2 as rs
 import numpy as np
 import cv2
 import ar_system.Img_sender as Img_sender
+import ar_system.target_grid as target_grid
+from ar_system.model_loader import load_model_async
 import time 
 from ar_system.tcp_manager import TCPServer
 import json
-from ultralytics import YOLO
 import math
 from enum import Enum , auto
 import threading 
+import argparse
+import sys
+from ar_system.config import PROFILES, build_config, write_effective_config
 
 # ===================================================================
 # 1. 状态机核心定义
@@ -35,6 +39,7 @@ def set_system_state(new_state):
         # 当状态返回到“空闲”时，清除所有上一轮的上下文信息
         if new_state == SystemState.IDLE_DETECTING:
             selected_object_id = None
+            move_requested.clear()
             
             if tracked_objects_state: 
                 tracked_objects_state.clear()
@@ -48,7 +53,13 @@ def set_system_state(new_state):
 current_state = SystemState.IDLE_DETECTING # 初始化系统状态
 selected_object_id = None # 存储被选中的物体ID
 server = None 
-move_target_points = None  # 用于在MOVE_MODE下临时存储九宫格坐标
+move_target_points = None  # 用于在MOVE_MODE下临时存储可用目标点 {id: 坐标}
+move_grid = None  # 启动时按相机分辨率预先计算好的目标网格
+move_requested = threading.Event()  # 收到"move"指令后置位，由主循环对齐一帧深度图并生成目标点
+GRID_ROWS = 3  # 目标网格行数，启动时由配置覆盖
+GRID_COLS = 3  # 目标网格列数，启动时由配置覆盖
+MASK_OCCUPIED = True  # 是否屏蔽被物体占用的目标单元，启动时由配置覆盖
+MASK_INVALID_DEPTH = True  # 是否屏蔽没有有效深度的目标单元，启动时由配置覆盖
 
 
 
@@ -78,15 +89,12 @@ def execute_robot_arm_task(command, target_info=None):
     set_system_state(SystemState.IDLE_DETECTING)
 
 
-def generate_nine_points(width, height):
-    """生成九宫格中每个区域中心点的坐标"""
-    points = []
-    for i in range(3):  # 代表行 (y)
-        for j in range(3):  # 代表列 (x)
-            x = int(width * (2 * j + 1) / 6)
-            y = int(height * (2 * i + 1) / 6)
-            points.append([x, y])
-    return points
+def get_focus_box():
+    """在“等待指令”和“移动模式”下返回被选中物体的边界框，否则返回None。"""
+    if current_state not in (SystemState.AWAITING_COMMAND, SystemState.MOVE_MODE):
+        return None
+    selected = tracked_objects_state.get(selected_object_id)
+    return selected["box"] if selected else None
 
 
 def handle_unity_selection_and_verify(payload):
@@ -115,7 +123,7 @@ def handle_unity_selection_and_verify(payload):
                 target_id = selection_data.get('selected_id')
                 
                 # 根据收到的ID，从之前存储的列表中查找对应的坐标
-                if move_target_points and 0 <= target_id < len(move_target_points):
+                if move_target_points and target_id in move_target_points:
                     target_point = move_target_points[target_id]
                     print(f"PC端：Unity选择的目标点ID是: {target_id}, 对应坐标是: {target_point}")
 
@@ -136,9 +144,39 @@ def handle_unity_selection_and_verify(payload):
         print(f"PC端：处理selection回调时出错: {e}")
 
 
+def enter_move_mode(depth_image):
+    """
+    根据当前帧的深度图生成可用的移动目标点，发送给Unity并切换到“移动模式”。
+    由主循环在收到"move"指令后的下一帧调用。
+    """
+    global move_target_points
+
+    # 等待期间状态可能已经改变
+    if current_state != SystemState.AWAITING_COMMAND:
+        return
+
+    # 从预先计算好的网格中，屏蔽被物体占用或没有有效深度的单元（两种屏蔽都可以在配置中关闭）
+    occupied_boxes = [obj["box"] for obj in tracked_objects_state.values()] if MASK_OCCUPIED else None
+    targets = target_grid.select_targets(move_grid, occupied_boxes, depth_image)
+    if not targets:
+        print("没有可用的移动目标点。")
+        if server:
+            server.send("subtitle", "当前没有可用的目标位置，请选择其他操作。")
+        return
+
+    # 切换到“移动模式”
+    set_system_state(SystemState.MOVE_MODE)
+
+    # 将可用的目标点存储到全局变量中，以便后续按ID直接查找
+    move_target_points = {cell.id: cell.pos for cell in targets}
+    if server:
+        server.send("point_list", target_grid.build_point_list_message(targets, GRID_ROWS, GRID_COLS))
+        server.send("subtitle", "请注视您想移动到的目标位置。")
+
+
 def handle_unity_command(payload):
     """处理Unity发送的'command'消息。只在"等待指令"状态下响应。"""
-    global server, move_target_points
+    global server
     
     # 必须是在等待指令的状态下，才处理这些命令
     if current_state != SystemState.AWAITING_COMMAND:
@@ -152,17 +190,8 @@ def handle_unity_command(payload):
     print(f"收到指令 '{payload}'，当前状态正确，开始处理。")
     
     if payload == "move":
-        # 切换到“移动模式”
-        set_system_state(SystemState.MOVE_MODE)
-        
-        # 生成九宫格坐标点并发送给Unity
-        nine_points_coords = generate_nine_points(WIDTH, HEIGHT) 
-        # 将生成的坐标点存储到全局变量中，以便后续查找
-        move_target_points = nine_points_coords
-        nine_points_data = [{"id": i, "pos": pos} for i, pos in enumerate(nine_points_coords)]
-        if server:
-            server.send("point_list", {"points": nine_points_data})
-            server.send("subtitle", "请注视您想移动到的目标位置。")
+        # 深度对齐比较耗时，不在每一帧都做，而是交给主循环在下一帧只做一次
+        move_requested.set()
 
     elif payload in ["eat", "grub", "door", "plate"]:
         # 对于其他直接执行的指令
@@ -182,30 +211,115 @@ def handle_unity_command(payload):
 # 3. 主函数
 # ===================================================================
 
+def parse_args():
+    """解析命令行参数。返回 (配置文件路径, 档位, 输出目录, 覆盖值字典)。"""
+    parser = argparse.ArgumentParser(description="SSVEP-MRControl PC端服务器")
+    parser.add_argument("--config", help="YAML/TOML 配置文件路径")
+    parser.add_argument("--profile", choices=sorted(PROFILES), help="性能档位")
+    parser.add_argument("--run-dir", default="runs", help="本次运行生效配置的输出目录")
+    parser.add_argument("--unity-ip", help="Unity客户端的IP地址")
+    parser.add_argument("--udp-port", type=int, help="视频流UDP端口")
+    parser.add_argument("--tcp-port", type=int, help="指令TCP端口")
+    parser.add_argument("--width", type=int, help="相机/视频流宽度")
+    parser.add_argument("--height", type=int, help="相机/视频流高度")
+    parser.add_argument("--fps", type=int, help="相机帧率")
+    parser.add_argument("--chunk-size", type=int, help="UDP数据包最大字节数")
+    parser.add_argument("--jpeg-quality", type=int, help="完整画面的JPEG质量")
+    parser.add_argument("--focus-quality", type=int, help="选中物体裁剪画面的JPEG质量")
+    parser.add_argument("--model", help="YOLO权重文件路径")
+    parser.add_argument("--model-cache-dir", help="预处理模型的缓存目录，传空字符串关闭缓存")
+    parser.add_argument("--imgsz", type=int, help="推理尺寸")
+    parser.add_argument("--detect-stride", type=int, help="每隔多少帧做一次检测")
+    parser.add_argument("--move-threshold", type=float, help="物体移动超过多少像素才发送更新")
+    parser.add_argument("--grid-rows", type=int, help="移动目标网格行数")
+    parser.add_argument("--grid-cols", type=int, help="移动目标网格列数")
+    parser.add_argument("--no-mask-occupied", dest="mask_occupied", action="store_false", default=None,
+                        help="不屏蔽被物体占用的目标单元")
+    parser.add_argument("--no-mask-depth", dest="mask_invalid_depth", action="store_false", default=None,
+                        help="不屏蔽没有有效深度的目标单元")
+    args = parser.parse_args()
+
+    # 命令行参数 -> (配置节, 配置项)
+    flag_keys = {
+        "unity_ip": ("network", "unity_ip"),
+        "udp_port": ("network", "udp_port"),
+        "tcp_port": ("network", "tcp_port"),
+        "width": ("camera", "width"),
+        "height": ("camera", "height"),
+        "fps": ("camera", "fps"),
+        "chunk_size": ("stream", "chunk_size"),
+        "jpeg_quality": ("stream", "full_frame_quality"),
+        "focus_quality": ("stream", "focus_quality"),
+        "model": ("detection", "model_path"),
+        "model_cache_dir": ("detection", "model_cache_dir"),
+        "imgsz": ("detection", "imgsz"),
+        "detect_stride": ("detection", "stride"),
+        "move_threshold": ("detection", "move_threshold"),
+        "grid_rows": ("grid", "rows"),
+        "grid_cols": ("grid", "cols"),
+        "mask_occupied": ("grid", "mask_occupied"),
+        "mask_invalid_depth": ("grid", "mask_invalid_depth"),
+    }
+    overrides = {}
+    for flag, (section, key) in flag_keys.items():
+        value = getattr(args, flag)
+        if value is not None:
+            overrides.setdefault(section, {})[key] = value
+    return args.config, args.profile, args.run_dir, overrides
+
+
 if __name__=="__main__":
-    
+
+    # --- 读取配置 ---
+    config_path, profile_name, run_dir, overrides = parse_args()
+    try:
+        app_config = build_config(config_path, profile_name, overrides)
+    except (ValueError, ImportError, OSError) as e:
+        print(f"配置无效: {e}")
+        exit(1)
+
     # --- 网络配置 ---
-    # 将IP和端口定义为变量，方便修改
-    UNITY_IP = "127.0.0.1"
-    UNITY_UDP_PORT = 9999
-    UNITY_TCP_PORT = 9998
+    UNITY_IP = app_config["network"]["unity_ip"]
+    UNITY_UDP_PORT = app_config["network"]["udp_port"]
+    UNITY_TCP_PORT = app_config["network"]["tcp_port"]
 
     # --- 相机配置 ---
     pipeline = rs.pipeline()
     config = rs.config()
-    WIDTH = 640
-    HEIGHT = 480
-    FPS = 30
+    WIDTH = app_config["camera"]["width"]
+    HEIGHT = app_config["camera"]["height"]
+    FPS = app_config["camera"]["fps"]
+
+    # --- YOLO模型配置 ---
+    # 最先在后台线程中导入ultralytics并加载模型，与TCP服务和相机的启动并行进行
+    MODEL_PATH = app_config["detection"]["model_path"]
+    IMGSZ = app_config["detection"]["imgsz"]
+    DETECT_STRIDE = app_config["detection"]["stride"]
+    model_loader = load_model_async(MODEL_PATH, warmup_size=(HEIGHT, WIDTH), imgsz=IMGSZ,
+                                    cache_dir=app_config["detection"]["model_cache_dir"])
+    print("正在后台加载YOLO模型...")
+
     config.enable_stream(rs.stream.depth, WIDTH, HEIGHT, rs.format.z16, FPS)
     config.enable_stream(rs.stream.color, WIDTH, HEIGHT, rs.format.bgr8, FPS)
+    # 用实际连接的相机再检查一次分辨率和帧率组合
+    if not config.can_resolve(rs.pipeline_wrapper(pipeline)):
+        print(f"当前相机不支持 {WIDTH}x{HEIGHT}@{FPS}FPS 的彩色+深度流，请更换配置。")
+        exit(1)
+    # 配置通过了所有检查才记录，被拒绝的启动不会留下配置文件
+    print(f"已写入本次运行的生效配置: {write_effective_config(app_config, run_dir, config_path, sys.argv)}")
     colorizer = rs.colorizer()
+    # 将深度图对齐到彩色图，用于判断目标网格单元的深度是否有效
+    align = rs.align(rs.stream.color)
 
-    print("正在启动相机流...")
-    profile = pipeline.start(config)
-    print(f"相机已启动，正在向 {UNITY_IP}:{UNITY_UDP_PORT} 发送图像，按'ESC'键退出。")
-
+    # --- 移动目标网格 ---
+    GRID_ROWS = app_config["grid"]["rows"]
+    GRID_COLS = app_config["grid"]["cols"]
+    MASK_OCCUPIED = app_config["grid"]["mask_occupied"]
+    MASK_INVALID_DEPTH = app_config["grid"]["mask_invalid_depth"]
+    move_grid = target_grid.build_grid(WIDTH, HEIGHT, GRID_ROWS, GRID_COLS)
 
      # --- 通信配置 ---
+    # TCP服务启动很快，放在相机之前，让Unity客户端尽早连上
     server = TCPServer(UNITY_IP,UNITY_TCP_PORT)
     # 注册回调
     server.register_callback("selection", handle_unity_selection_and_verify)
@@ -214,16 +328,27 @@ if __name__=="__main__":
     print("--- Python TCP服务器已就绪，等待 Unity 客户端连接... ---")
 
 
-    # --- YOLO模型配置 ---
-    try:
-        model = YOLO('assets/yolo11n.pt')
-    except Exception as e:
-        print(f"加载YOLO模型失败，请检查网络连接或文件路径。错误: {e}")
-        exit()
+    print("正在启动相机流...")
+    profile = pipeline.start(config)
+    print(f"相机已启动，正在向 {UNITY_IP}:{UNITY_UDP_PORT} 发送图像，按'ESC'键退出。")
 
     # --- 状态追踪变量 ---
     tracked_objects_state = {}
-    MOVE_THRESHOLD = 5 
+    MOVE_THRESHOLD = app_config["detection"]["move_threshold"]
+
+    # --- 视频流配置 ---
+    # 选中物体后，完整画面每隔 BACKGROUND_FRAME_INTERVAL 帧才发送一次，
+    # 带宽留给高质量的选中物体裁剪画面
+    BACKGROUND_FRAME_INTERVAL = app_config["stream"]["background_frame_interval"]
+    CHUNK_SIZE = app_config["stream"]["chunk_size"]
+    FULL_FRAME_QUALITY = app_config["stream"]["full_frame_quality"]
+    FOCUS_QUALITY = app_config["stream"]["focus_quality"]
+    stream_frame_index = 0
+
+    # --- 就绪通知 ---
+    # 记录已经收到视频流分辨率和"系统就绪"字幕的客户端连接，客户端重连后会重新通知
+    configured_connection = None
+    announced_connection = None
 
     # --- FPS 计算变量 ---
     frame_count, start_time, display_fps = 0, time.time(), 0
@@ -238,13 +363,50 @@ if __name__=="__main__":
                 continue
             
             color_image = np.asanyarray(color_frame.get_data())
-            Img_sender.send_image(color_image, UNITY_IP, UNITY_UDP_PORT)
+
+            # 新连接的客户端先收到视频流分辨率，Unity据此把像素坐标转换为画面上的位置
+            if server.client_connection and configured_connection is not server.client_connection:
+                server.send("stream_config", {"width": WIDTH, "height": HEIGHT})
+                configured_connection = server.client_connection
+
+            # 收到"move"指令后，只对这一帧做深度对齐，用来筛选目标点；关闭深度屏蔽时不做对齐
+            if move_requested.is_set():
+                move_requested.clear()
+                depth_image = None
+                if MASK_INVALID_DEPTH:
+                    depth_frame = align.process(frames).get_depth_frame()
+                    depth_image = np.asanyarray(depth_frame.get_data()) if depth_frame else None
+                enter_move_mode(depth_image)
+
+            focus_box = get_focus_box()
+            if focus_box is None or stream_frame_index % BACKGROUND_FRAME_INTERVAL == 0:
+                Img_sender.send_image(color_image, UNITY_IP, UNITY_UDP_PORT, quality=FULL_FRAME_QUALITY, chunk_size=CHUNK_SIZE)
+            if focus_box is not None:
+                Img_sender.send_focus_crop(color_image, focus_box, UNITY_IP, UNITY_UDP_PORT, quality=FOCUS_QUALITY, chunk_size=CHUNK_SIZE)
+            stream_frame_index += 1
+
+            # --- 模型就绪检查：加载期间只推送视频流 ---
+            model = model_loader.get()
+            if model_loader.ready.is_set() and model is None:
+                break # 模型加载失败，错误信息已由加载线程打印
+
+            if model is not None and server.client_connection and announced_connection is not server.client_connection:
+                server.send("subtitle", "系统已就绪，请注视想要选择的物体。")
+                announced_connection = server.client_connection
 
             # --- 状态判断：根据当前状态执行特定逻辑 ---
 
+            # 模型仍在后台加载
+            if model is None:
+                cv2.putText(color_image, "LOADING MODEL...", (10, 60), cv2.FONT_HERSHEY_SIMPLEX, 1, (255, 255, 0), 2)
+
+            # 状态 1 的跳帧：每隔 DETECT_STRIDE 帧才检测一次，其余帧沿用上一次的结果
+            elif current_state == SystemState.IDLE_DETECTING and stream_frame_index % DETECT_STRIDE != 0:
+                pass
+
             # 状态 1: 空闲 / 侦测中
-            if current_state == SystemState.IDLE_DETECTING:
-                results = model.track(source=color_image, persist=True, verbose=False)
+            elif current_state == SystemState.IDLE_DETECTING:
+                results = model.track(source=color_image, persist=True, imgsz=IMGSZ, verbose=False)
                 current_objects = {}
                 
                 if results[0].boxes.id is not None:
@@ -256,7 +418,7 @@ if __name__=="__main__":
                     for track_id, box_coords, cls_id in zip(tracked_boxes.id.int().cpu().tolist(), tracked_boxes.xyxy.cpu().tolist(), tracked_boxes.cls.int().cpu().tolist()):
                         x1, y1, x2, y2 = map(int, box_coords)
                         center_x, center_y = (x1 + x2) // 2, (y1 + y2) // 2
-                        current_objects[track_id] = {"pos": [center_x, center_y]}
+                        current_objects[track_id] = {"pos": [center_x, center_y], "box": [x1, y1, x2, y2]}
                         label = f"ID:{track_id} {model.names[cls_id]}"
                         cv2.rectangle(color_image, (x1, y1), (x2, y2), (0, 255, 0), 2)
                         cv2.circle(color_image, (center_x, center_y), 3, (0, 0, 255), -1)
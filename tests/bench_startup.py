@@ -0,0 +1,325 @@
+import argparse
+import json
+import re
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+import numpy as np
+
+#################################################
+# 启动耗时基准测试
+# 1. 用 `python -X importtime` 统计各个重量级依赖的导入耗时
+# 2. 按旧的串行顺序（相机 -> TCP服务 -> 加载模型）和新的并行顺序
+#    （后台加载模型 | TCP服务 -> 相机 -> 立即推流）分别跑一遍启动流程，
+#    记录头显端能感知到的几个时间点：TCP开始监听、第一帧UDP画面发出、就绪字幕发出
+# 3. 用一个空的缓存目录连续加载两次模型，对比缓存未命中（从 .pt 构建）和命中（加载预处理模型）的耗时
+# 没有相机或没有安装 ultralytics 时，分别用固定耗时的桩代替；缓存测试需要 ultralytics
+# 用法: python tests/bench_startup.py [--model 模型路径] [--stub-camera-s 秒] [--stub-model-s 秒]
+#################################################
+
+# 项目根目录，保证从任意位置运行都能导入 ar_system 和 mian
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+HEAVY_MODULES = ["numpy", "cv2", "pyrealsense2", "torch", "ultralytics"]
+
+# -X importtime 输出格式: "import time:  self [us] | cumulative | imported package"
+IMPORTTIME_LINE = re.compile(r"import time:\s+(\d+)\s+\|\s+(\d+)\s+\|\s*(\S+)")
+
+MILESTONES = ["tcp_listening", "first_frame_sent", "ready_sent"]
+
+
+def import_breakdown(module, top=10):
+    """
+    在独立的子进程中导入模块，返回总耗时和耗时最多的子模块。
+
+    Returns:
+        tuple: (总耗时秒数, [(累计耗时秒数, 模块名), ...])；模块不存在时返回 None。
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True, text=True, cwd=ROOT,
+    )
+    if result.returncode != 0:
+        return None
+
+    entries = []
+    total = 0.0
+    for line in result.stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if not match:
+            continue
+        cumulative = int(match.group(2)) / 1e6
+        name = match.group(3)
+        entries.append((cumulative, name))
+        if name == module:
+            total = cumulative
+    entries.sort(reverse=True)
+    return total, entries[:top]
+
+
+# ===================================================================
+# 相机与模型：有真实设备/依赖时使用真实的，否则使用桩
+# ===================================================================
+
+class StubCamera:
+    """模拟相机：启动耗时固定，之后以30FPS返回黑色画面"""
+    def __init__(self, width, height, start_s):
+        self.width, self.height, self.start_s = width, height, start_s
+
+    def start(self):
+        time.sleep(self.start_s)
+
+    def read(self):
+        time.sleep(1 / 30)
+        return np.zeros((self.height, self.width, 3), dtype=np.uint8)
+
+    def stop(self):
+        pass
+
+
+class RealSenseCamera:
+    def __init__(self, width, height):
+        import pyrealsense2 as rs
+        self.pipeline = rs.pipeline()
+        self.config = rs.config()
+        self.config.enable_stream(rs.stream.depth, width, height, rs.format.z16, 30)
+        self.config.enable_stream(rs.stream.color, width, height, rs.format.bgr8, 30)
+
+    def start(self):
+        self.pipeline.start(self.config)
+
+    def read(self):
+        while True:
+            color_frame = self.pipeline.wait_for_frames().get_color_frame()
+            if color_frame:
+                return np.asanyarray(color_frame.get_data())
+
+    def stop(self):
+        self.pipeline.stop()
+
+
+class StubLoader:
+    """模拟 ModelLoader：在后台线程中等待固定时间后就绪"""
+    def __init__(self, load_s):
+        self.load_s = load_s
+        self.ready = threading.Event()
+
+    def start(self):
+        threading.Thread(target=lambda: (time.sleep(self.load_s), self.ready.set()), daemon=True).start()
+        return self
+
+    def get(self):
+        return object() if self.ready.is_set() else None
+
+    def wait(self, timeout=None):
+        self.ready.wait(timeout)
+        return self.get()
+
+
+def open_camera(width, height, stub_s):
+    try:
+        import pyrealsense2 as rs
+        if len(rs.context().query_devices()) > 0:
+            return RealSenseCamera(width, height), "realsense"
+    except ImportError:
+        pass
+    return StubCamera(width, height, stub_s), f"stub ({stub_s}s)"
+
+
+def make_loader(model_path, height, width, stub_s):
+    try:
+        import importlib.util
+        if importlib.util.find_spec("ultralytics") is None:
+            raise ImportError
+        from ar_system.model_loader import ModelLoader
+        return ModelLoader(model_path, warmup_size=(height, width)), "ultralytics"
+    except ImportError:
+        return StubLoader(stub_s), f"stub ({stub_s}s)"
+
+
+# ===================================================================
+# 启动流程计时
+# ===================================================================
+
+def free_port(kind):
+    with socket.socket(socket.AF_INET, kind) as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def headset_client(port, stop):
+    """模拟头显：不断尝试连接TCP服务，连上后持续读取消息"""
+    while not stop.is_set():
+        try:
+            with socket.create_connection(("127.0.0.1", port), timeout=0.2) as conn:
+                conn.settimeout(0.2)
+                while not stop.is_set():
+                    try:
+                        if not conn.recv(4096):
+                            break
+                    except socket.timeout:
+                        continue
+        except OSError:
+            time.sleep(0.01)
+
+
+def run_startup(scenario, args):
+    """
+    按指定顺序执行一次启动流程。
+
+    Returns:
+        dict: 各里程碑相对启动开始的秒数，以及所用相机/模型的类型。
+    """
+    import ar_system.Img_sender as Img_sender
+    from ar_system.tcp_manager import TCPServer
+
+    width, height = 640, 480
+    tcp_port, udp_port = free_port(socket.SOCK_STREAM), free_port(socket.SOCK_DGRAM)
+    camera, camera_kind = open_camera(width, height, args.stub_camera_s)
+    loader, model_kind = make_loader(args.model, height, width, args.stub_model_s)
+
+    stop = threading.Event()
+    threading.Thread(target=headset_client, args=(tcp_port, stop), daemon=True).start()
+
+    result = {"camera": camera_kind, "model": model_kind}
+    t0 = time.time()
+    server = TCPServer("127.0.0.1", tcp_port)
+
+    if scenario == "serial":
+        # 旧顺序：相机 -> TCP服务 -> 阻塞加载模型 -> 开始推流
+        camera.start()
+        server.start()
+        result["tcp_listening"] = time.time() - t0
+        loader.start().wait()
+    else:
+        # 新顺序：后台加载模型 -> TCP服务 -> 相机 -> 立即推流
+        loader.start()
+        server.start()
+        result["tcp_listening"] = time.time() - t0
+        camera.start()
+
+    try:
+        deadline = time.time() + args.timeout
+        while time.time() < deadline:
+            Img_sender.send_image(camera.read(), "127.0.0.1", udp_port)
+            result.setdefault("first_frame_sent", time.time() - t0)
+            if loader.get() is not None and server.client_connection:
+                server.send("subtitle", "系统已就绪，请注视想要选择的物体。")
+                result["ready_sent"] = time.time() - t0
+                break
+    finally:
+        stop.set()
+        camera.stop()
+        server.stop()
+    return result
+
+
+def bench_startup_order(args):
+    """在独立的子进程中分别运行两种启动顺序，避免导入缓存互相影响"""
+    results = {}
+    for scenario in ("serial", "parallel"):
+        command = [sys.executable, __file__, "--scenario", scenario,
+                   "--model", args.model,
+                   "--stub-camera-s", str(args.stub_camera_s),
+                   "--stub-model-s", str(args.stub_model_s),
+                   "--timeout", str(args.timeout)]
+        output = subprocess.run(command, capture_output=True, text=True, cwd=ROOT).stdout
+        # 只取最后一行的JSON结果，前面是TCP服务等打印的日志
+        results[scenario] = json.loads(output.strip().splitlines()[-1])
+
+    print(f"相机: {results['serial']['camera']}, 模型: {results['serial']['model']}")
+    print(f"{'里程碑':<18}{'串行(旧)':>10}{'并行(新)':>10}")
+    for milestone in MILESTONES:
+        row = [results[s].get(milestone) for s in ("serial", "parallel")]
+        print(f"{milestone:<20}" + "".join(f"{v:>10.2f}" if v is not None else f"{'超时':>10}" for v in row))
+
+
+# ===================================================================
+# 模型缓存：未命中 vs 命中
+# ===================================================================
+
+def run_model_cache(args):
+    """
+    用指定的缓存目录加载一次模型，等缓存写入结束后返回。
+
+    Returns:
+        dict: 是否命中缓存，以及从开始加载到模型可用的秒数。
+    """
+    from ar_system.model_loader import ModelLoader
+
+    loader = ModelLoader(args.model, warmup_size=(480, 640), imgsz=args.imgsz, cache_dir=args.cache_dir).start()
+    loader.wait()
+    loader.cache_saved.wait()
+    return {"cache_hit": loader.cache_hit, "load_time": loader.load_time}
+
+
+def bench_model_cache(args):
+    """在同一个空缓存目录上先后启动两个子进程：第一次未命中并写入缓存，第二次命中"""
+    import importlib.util
+    if importlib.util.find_spec("ultralytics") is None:
+        print("ultralytics 未安装，跳过")
+        return
+
+    with tempfile.TemporaryDirectory() as cache_dir:
+        command = [sys.executable, __file__, "--scenario", "cache",
+                   "--model", args.model,
+                   "--imgsz", str(args.imgsz),
+                   "--cache-dir", cache_dir]
+        runs = []
+        for _ in range(2):
+            output = subprocess.run(command, capture_output=True, text=True, cwd=ROOT).stdout
+            runs.append(json.loads(output.strip().splitlines()[-1]))
+
+    for label, run in zip(("首次启动", "再次启动"), runs):
+        status = {True: "命中", False: "未命中", None: "未使用"}[run["cache_hit"]]
+        load_time = f"{run['load_time']:.2f} s" if run["load_time"] is not None else "加载失败"
+        print(f"{label}  缓存{status:<4} {load_time}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="启动耗时基准测试")
+    parser.add_argument("--model", default="assets/yolo11n.pt", help="YOLO权重文件路径")
+    parser.add_argument("--stub-camera-s", type=float, default=1.5, help="没有相机时模拟的相机启动耗时")
+    parser.add_argument("--stub-model-s", type=float, default=4.0, help="没有ultralytics时模拟的模型加载耗时")
+    parser.add_argument("--timeout", type=float, default=60.0, help="等待就绪的最长时间")
+    parser.add_argument("--imgsz", type=int, default=640, help="缓存测试使用的推理尺寸")
+    parser.add_argument("--scenario", choices=["serial", "parallel", "cache"], help=argparse.SUPPRESS)
+    parser.add_argument("--cache-dir", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.scenario == "cache":
+        print(json.dumps(run_model_cache(args)))
+        sys.exit(0)
+    if args.scenario:
+        print(json.dumps(run_startup(args.scenario, args)))
+        sys.exit(0)
+
+    print("==== 导入耗时 (-X importtime) ====")
+    for module in HEAVY_MODULES:
+        breakdown = import_breakdown(module)
+        if breakdown is None:
+            print(f"{module:<14} 未安装，跳过")
+            continue
+        total, entries = breakdown
+        print(f"{module:<14} {total:.3f} s")
+        for cumulative, name in entries[1:6]:
+            print(f"    {cumulative:.3f} s  {name}")
+
+    print("==== 主程序模块导入耗时 ====")
+    breakdown = import_breakdown("mian")
+    if breakdown is None:
+        print("mian 导入失败（缺少依赖），跳过")
+    else:
+        print(f"mian           {breakdown[0]:.3f} s")
+
+    print("==== 启动流程里程碑（秒，从启动开始计） ====")
+    bench_startup_order(args)
+
+    print("==== 模型缓存（从开始加载到模型可用） ====")
+    bench_model_cache(args)
@@ -0,0 +1,129 @@
+import json
+
+import pytest
+
+from ar_system.config import DEFAULT_CONFIG, PROFILES, build_config, write_effective_config
+
+#################################################
+# 服务器配置测试
+#################################################
+
+
+def test_defaults_match_previous_hardcoded_values():
+    config = build_config()
+    assert config["camera"] == {"width": 640, "height": 480, "fps": 30}
+    assert config["stream"]["chunk_size"] == 8192
+    assert config["detection"]["model_path"] == "assets/yolo11n.pt"
+    assert config["profile"] is None
+
+
+@pytest.mark.parametrize("profile", sorted(PROFILES))
+def test_every_profile_is_valid(profile):
+    config = build_config(profile=profile)
+    assert config["profile"] == profile
+    for section, values in PROFILES[profile].items():
+        for key, value in values.items():
+            assert config[section][key] == value
+
+
+def test_precedence_profile_then_file_then_flags(tmp_path):
+    path = tmp_path / "server.toml"
+    path.write_text('profile = "low-bandwidth"\n[stream]\nchunk_size = 4096\nfocus_quality = 60\n', encoding="utf-8")
+
+    config = build_config(str(path), overrides={"stream": {"focus_quality": 75}})
+    assert config["profile"] == "low-bandwidth"
+    assert config["camera"]["width"] == 424          # 来自档位
+    assert config["stream"]["chunk_size"] == 4096    # 配置文件覆盖档位
+    assert config["stream"]["focus_quality"] == 75   # 命令行覆盖配置文件
+
+
+def test_yaml_config(tmp_path):
+    pytest.importorskip("yaml")
+    path = tmp_path / "server.yaml"
+    path.write_text("camera:\n  width: 848\n  height: 480\n  fps: 60\n", encoding="utf-8")
+    assert build_config(str(path))["camera"] == {"width": 848, "height": 480, "fps": 60}
+
+
+@pytest.mark.parametrize("overrides", [
+    {"camera": {"width": 800, "height": 600}},   # 相机不支持的分辨率
+    {"camera": {"width": 1280, "height": 720, "fps": 60}},  # 该分辨率下不支持的帧率
+    {"camera": {"width": 424, "height": 240, "fps": 90}},   # 90 FPS 只有深度流支持
+    {"camera": {"width": 640, "height": 480, "fps": 90}},
+    {"camera": {"width": 848, "height": 480, "fps": 90}},
+    {"stream": {"chunk_size": 70000}},           # 超过UDP负载上限
+    {"stream": {"chunk_size": 5}},               # 分包过小
+    {"stream": {"chunk_size": 511}},
+    {"detection": {"imgsz": 500}},               # 不是32的倍数
+    {"detection": {"stride": 0}},
+    {"camera": {"exposure": 100}},               # 未知配置项
+    {"detection": {"imgsz": "640"}},             # 类型错误
+    {"camera": {"fps": True}},
+    {"network": {"udp_port": 9999.0}},
+    {"camera": 5},                               # 配置节不是键值表
+    {"camera": None},
+    {"grid": {"mask_occupied": 1}},              # 开关必须是布尔值
+])
+def test_invalid_combinations_are_rejected(overrides):
+    with pytest.raises(ValueError):
+        build_config(overrides=overrides)
+
+
+@pytest.mark.parametrize("text", [
+    "camera:\n",                 # 空的配置节
+    "camera: 5\n",
+    "detection:\n  imgsz: \"640\"\n",
+    "- 1\n- 2\n",               # 顶层不是键值表
+    "camera: [\n",               # YAML语法错误
+    "profile: [a]\n",            # profile 不是字符串
+])
+def test_malformed_yaml_is_rejected(tmp_path, text):
+    pytest.importorskip("yaml")
+    path = tmp_path / "server.yaml"
+    path.write_text(text, encoding="utf-8")
+    with pytest.raises(ValueError):
+        build_config(str(path))
+
+
+def test_malformed_toml_is_rejected(tmp_path):
+    path = tmp_path / "server.toml"
+    path.write_text("[camera\nwidth = 640\n", encoding="utf-8")
+    with pytest.raises(ValueError):
+        build_config(str(path))
+
+
+def test_grid_masks_can_be_disabled():
+    config = build_config(overrides={"grid": {"mask_occupied": False, "mask_invalid_depth": False}})
+    assert config["grid"]["mask_occupied"] is False
+    assert config["grid"]["mask_invalid_depth"] is False
+    assert build_config()["grid"]["mask_occupied"] is True
+
+
+def test_float_setting_accepts_int():
+    assert build_config(overrides={"detection": {"move_threshold": 8}})["detection"]["move_threshold"] == 8
+
+
+def test_unknown_profile_is_rejected():
+    with pytest.raises(ValueError):
+        build_config(profile="turbo")
+
+
+def test_build_config_does_not_mutate_defaults():
+    build_config(profile="max-accuracy")
+    assert DEFAULT_CONFIG["camera"]["width"] == 640
+
+
+def test_effective_config_is_written(tmp_path):
+    config = build_config(profile="low-latency")
+    argv = ["mian.py", "--profile", "low-latency"]
+    path = write_effective_config(config, str(tmp_path / "runs"), "server.yaml", argv)
+    with open(path, encoding="utf-8") as f:
+        record = json.load(f)
+    assert record["config"] == config
+    assert record["config_path"] == "server.yaml"
+    assert record["argv"] == argv
+
+
+def test_effective_config_files_do_not_overwrite(tmp_path):
+    config = build_config()
+    paths = {write_effective_config(config, str(tmp_path)) for _ in range(5)}
+    assert len(paths) == 5
@@ -0,0 +1,40 @@
+import os
+
+from ar_system.model_loader import cache_key, cached_model_path
+
+#################################################
+# 模型缓存键测试
+# 权重文件、修改时间、推理尺寸、设备任意一项变化，都必须换一个缓存文件
+#################################################
+
+
+def make_weights(tmp_path):
+    path = tmp_path / "yolo11n.pt"
+    path.write_bytes(b"weights")
+    return str(path)
+
+
+def test_cache_key_is_stable(tmp_path):
+    weights = make_weights(tmp_path)
+    assert cache_key(weights, 640, "cpu", "8.0") == cache_key(weights, 640, "cpu", "8.0")
+
+
+def test_cache_key_changes_with_inputs(tmp_path):
+    weights = make_weights(tmp_path)
+    base = cache_key(weights, 640, "cpu", "8.0")
+    assert cache_key(weights, 320, "cpu", "8.0") != base
+    assert cache_key(weights, 640, "cuda:0", "8.0") != base
+    assert cache_key(weights, 640, "cpu", "8.1") != base
+
+    stat = os.stat(weights)
+    os.utime(weights, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    assert cache_key(weights, 640, "cpu", "8.0") != base
+
+
+def test_cached_model_path_is_inside_cache_dir(tmp_path):
+    weights = make_weights(tmp_path)
+    cache_dir = str(tmp_path / "cache")
+    path = cached_model_path(cache_dir, weights, 640, "cpu")
+    assert os.path.dirname(path) == cache_dir
+    assert os.path.basename(path).startswith("yolo11n_")
+    assert path.endswith(".torchscript")
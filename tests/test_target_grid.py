@@ -0,0 +1,58 @@
+import numpy as np
+
+import ar_system.target_grid as target_grid
+
+#################################################
+# 移动目标网格测试
+#################################################
+
+
+def test_default_grid_matches_nine_points():
+    grid = target_grid.build_grid(640, 480)
+    assert len(grid) == 9
+    # 与原先 generate_nine_points 的九宫格中心点一致
+    assert [cell.pos for cell in grid][:3] == [(106, 80), (320, 80), (533, 80)]
+    assert [cell.id for cell in grid] == list(range(9))
+
+
+def test_grid_is_cached_per_resolution():
+    assert target_grid.build_grid(640, 480, 4, 6) is target_grid.build_grid(640, 480, 4, 6)
+    assert target_grid.build_grid(640, 480, 4, 6) is not target_grid.build_grid(1280, 720, 4, 6)
+
+
+def test_cells_tile_the_image():
+    grid = target_grid.build_grid(641, 479, 5, 7)
+    area = sum((x2 - x1) * (y2 - y1) for x1, y1, x2, y2 in (cell.rect for cell in grid))
+    assert area == 641 * 479
+
+
+def test_occupied_and_invalid_depth_cells_are_masked():
+    grid = target_grid.build_grid(640, 480)
+    depth = np.full((480, 640), 800, dtype=np.uint16)
+    depth[320:480, 0:213] = 0  # 左下角单元没有有效深度
+
+    targets = target_grid.select_targets(grid, occupied_boxes=[[300, 220, 340, 260]], depth_image=depth)
+    ids = [cell.id for cell in targets]
+    assert 4 not in ids  # 中心单元被物体占用
+    assert 6 not in ids  # 左下角单元深度无效
+    assert len(ids) == 7
+
+
+def test_disabled_masks_keep_every_cell():
+    grid = target_grid.build_grid(640, 480)
+    assert len(target_grid.select_targets(grid, None, None)) == 9
+
+
+def test_point_list_message_keeps_cell_ids():
+    grid = target_grid.build_grid(640, 480)
+    message = target_grid.build_point_list_message(grid[2:4], 3, 3)
+    assert message["rows"] == 3 and message["cols"] == 3
+    assert [point["id"] for point in message["points"]] == [2, 3]
+    assert message["points"][0]["pos"] == [533, 80]
+
+
+def test_cached_grid_is_immutable():
+    grid = target_grid.build_grid(640, 480)
+    message = target_grid.build_point_list_message(grid, 3, 3)
+    message["points"][0]["pos"][0] = -1
+    assert target_grid.build_grid(640, 480)[0].pos == (106, 80)
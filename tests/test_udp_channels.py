@@ -0,0 +1,77 @@
+import socket
+import threading
+
+import cv2
+import numpy as np
+
+import ar_system.Img_sender as Img_sender
+
+#################################################
+# UDP多通道传输本地回环测试
+# 在本机起一个接收端，按通道号重组数据包，验证两路画面都能完整解码
+#################################################
+
+
+def receive_frames(sock, channels, frames, timeout=2.0):
+    """
+    按照 Img_sender 的协议接收数据包，直到每个通道都重组出一帧完整图像。
+
+    Args:
+        sock (socket.socket): 已绑定的UDP socket。
+        channels (set): 需要等待的通道号集合。
+        frames (dict): 输出参数，{通道号: JPEG字节}。超时后只包含已完整收到的通道。
+        timeout (float): 单次接收的超时时间（秒）。
+    """
+    sock.settimeout(timeout)
+    chunks = {c: {} for c in channels}
+    expected = {c: 0 for c in channels}
+
+    while set(frames.keys()) != channels:
+        try:
+            data, _ = sock.recvfrom(65535)
+        except socket.timeout:
+            return
+        packet_type, channel = data[0], data[1]
+        if channel not in channels:
+            continue
+
+        if packet_type == 0x01:  # 开始包
+            chunks[channel].clear()
+            expected[channel] = int.from_bytes(data[2:4], 'big')
+        elif packet_type == 0x00:  # 数据包
+            index = int.from_bytes(data[2:4], 'big')
+            chunks[channel][index] = data[4:]
+        elif packet_type == 0x02:  # 结束包
+            if expected[channel] > 0 and len(chunks[channel]) == expected[channel]:
+                frames[channel] = b''.join(chunks[channel][i] for i in range(expected[channel]))
+
+
+def test_full_frame_and_focus_crop_reassemble():
+    # 随机噪声图像压缩率低，能保证完整画面被分成多个数据包
+    rng = np.random.default_rng(0)
+    image = rng.integers(0, 256, (480, 640, 3), dtype=np.uint8)
+    box = [200, 150, 360, 330]
+
+    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 4 * 1024 * 1024)
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+
+        frames = {}
+        channels = {Img_sender.FULL_FRAME_CHANNEL, Img_sender.FOCUS_CHANNEL}
+        receiver = threading.Thread(target=receive_frames, args=(sock, channels, frames))
+        receiver.start()
+
+        Img_sender.send_image(image, "127.0.0.1", port)
+        Img_sender.send_focus_crop(image, box, "127.0.0.1", port)
+        receiver.join()
+
+    missing = channels - set(frames.keys())
+    assert not missing, f"接收超时，以下通道没有重组出完整的帧: {sorted(missing)}"
+
+    full = cv2.imdecode(np.frombuffer(frames[Img_sender.FULL_FRAME_CHANNEL], np.uint8), cv2.IMREAD_COLOR)
+    focus = cv2.imdecode(np.frombuffer(frames[Img_sender.FOCUS_CHANNEL], np.uint8), cv2.IMREAD_COLOR)
+    expected_crop = Img_sender.crop_around_box(image, box)
+
+    assert full.shape == image.shape
+    assert focus.shape == expected_crop.shape
@@ -36,9 +36,10 @@ public class ObjectMarkerManager : MonoBehaviour
     [Tooltip("用户需要注视多久才能选中标记（秒）")]
     public float selectionDwellTime = 2.0f;
 
-    // PC端的摄像头分辨率是640x480，用于坐标转换
-    private const float SOURCE_RESOLUTION_X = 640f;
-    private const float SOURCE_RESOLUTION_Y = 480f;
+    // PC端的摄像头分辨率，用于坐标转换。连接后由PC端的 stream_config 消息更新，
+    // 在收到之前默认为640x480
+    private float sourceResolutionX = 640f;
+    private float sourceResolutionY = 480f;
 
     // 使用字典来追踪当前所有活跃的标记，键是物体的track_id，值是对应的GameObject
     private Dictionary<int, GameObject> activeMarkers = new Dictionary<int, GameObject>();
@@ -73,6 +74,7 @@ public class ObjectMarkerManager : MonoBehaviour
         TCPManager.OnObjectRemoved += HandleObjectRemoved;
         TCPManager.OnPointsReceived += HandlePointsReceived;
         TCPManager.OnSubtitleReceived += HandleSubtitleReceived;
+        TCPManager.OnStreamConfigReceived += HandleStreamConfigReceived;
     }
 
     // 在脚本禁用时，取消“收听”，防止内存泄漏
@@ -84,6 +86,7 @@ public class ObjectMarkerManager : MonoBehaviour
         TCPManager.OnObjectRemoved -= HandleObjectRemoved;
         TCPManager.OnPointsReceived -= HandlePointsReceived;
         TCPManager.OnSubtitleReceived -= HandleSubtitleReceived;
+        TCPManager.OnStreamConfigReceived -= HandleStreamConfigReceived;
     }
 
 
@@ -151,6 +154,19 @@ public class ObjectMarkerManager : MonoBehaviour
     }
 
 
+    // 更新PC端视频流的分辨率，之后的坐标转换都使用它
+    private void HandleStreamConfigReceived(StreamConfig config)
+    {
+        if (config.width <= 0 || config.height <= 0)
+        {
+            Debug.LogError($"收到无效的视频流分辨率: {config.width}x{config.height}");
+            return;
+        }
+        sourceResolutionX = config.width;
+        sourceResolutionY = config.height;
+        Debug.Log($"视频流分辨率已更新为 {config.width}x{config.height}");
+    }
+
     // 处理从PC收到的九宫格目标点
     private void HandlePointsReceived(PointData[] points)
     {
@@ -190,8 +206,8 @@ public class ObjectMarkerManager : MonoBehaviour
         float parentHeight = markerParent.rect.height;
 
         // 1. 将像素坐标归一化 (0.0 to 1.0)
-        float normX = pixelCoords[0] / SOURCE_RESOLUTION_X;
-        float normY = pixelCoords[1] / SOURCE_RESOLUTION_Y;
+        float normX = pixelCoords[0] / sourceResolutionX;
+        float normY = pixelCoords[1] / sourceResolutionY;
 
         // 2. 将归一化坐标映射到父级RectTransform的本地坐标
         // UI坐标系的原点(0,0)在中心，而像素坐标原点在左上角，因此需要转换：
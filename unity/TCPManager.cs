@@ -42,6 +42,14 @@ public class PointDataList
     public PointData[] points;
 }
 
+// 用于承载 stream_config 消息的数据结构：PC端视频流的分辨率
+[System.Serializable]
+public class StreamConfig
+{
+    public int width;
+    public int height;
+}
+
 
 
 public class TCPManager : MonoBehaviour
@@ -51,6 +59,7 @@ public class TCPManager : MonoBehaviour
     public delegate void ObjectIdHandler(ObjectId data);
     public delegate void PointDataHandler(PointData[] points);
     public delegate void CommandHandler(string command); 
+    public delegate void StreamConfigHandler(StreamConfig config);
 
     // 为新消息类型创建静态事件（event），作为广播频道
     public static event ObjectDataHandler OnObjectAdded;
@@ -58,6 +67,7 @@ public class TCPManager : MonoBehaviour
     public static event ObjectIdHandler OnObjectRemoved;
     public static event CommandHandler OnSubtitleReceived; 
     public static event PointDataHandler OnPointsReceived;
+    public static event StreamConfigHandler OnStreamConfigReceived;
     
 
     // --- 单例模式 ---
@@ -266,6 +276,13 @@ public class TCPManager : MonoBehaviour
                         }
                         break;
 
+                    // 处理视频流配置（连接后PC端会先发送一次）
+                    case "stream_config":
+                        StreamConfig streamConfig = JsonUtility.FromJson<StreamConfig>(envelope.payload);
+                        Debug.Log($"[Unity收到消息] 类型: 'stream_config', 分辨率: {streamConfig.width}x{streamConfig.height}");
+                        OnStreamConfigReceived?.Invoke(streamConfig);
+                        break;
+
                     default:
                         Debug.LogWarning($"收到未知类型的消息: {envelope.type}");
                         break;
@@ -17,6 +17,12 @@ public class UDPImageReceiver : MonoBehaviour
     [Tooltip("用于显示接收到的图像的UI组件")]
     public RawImage displayImage;
 
+    [Tooltip("用于显示选中物体高质量裁剪画面的UI组件（可选）")]
+    public RawImage focusImage;
+
+    [Tooltip("裁剪画面超过这么多秒没有新帧就隐藏（PC端回到空闲状态后会停止发送裁剪画面）")]
+    public float focusTimeout = 0.5f;
+
 
     [Tooltip("用于显示帧率的UI Text组件")]
     public TextMeshProUGUI fpsText; // 用于显示FPS的文本组件
@@ -27,19 +33,32 @@ public class UDPImageReceiver : MonoBehaviour
     // UDP客户端
     private UdpClient client;
 
-    // 用于存储接收到的数据包，使用字典来处理可能乱序到达的数据包
-    private Dictionary<int, byte[]> frameChunks;
+    // 通道号，与PC端 Img_sender.py 保持一致
+    private const int FULL_FRAME_CHANNEL = 0;
+    private const int FOCUS_CHANNEL = 1;
+    private const int CHANNEL_COUNT = 2;
+
+    // 每个通道各自存储接收到的数据包，使用字典来处理可能乱序到达的数据包
+    private Dictionary<int, byte[]>[] frameChunks;
+
+    // 每个通道完整的图像数据
+    private byte[][] fullFrameData;
+    // 标志，表示某个通道是否有新的完整帧数据准备好了
+    private bool[] isFrameReady;
+    // 保护 fullFrameData 和 isFrameReady，接收线程与主线程之间交接数据时使用
+    private readonly object frameLock = new object();
 
-    // 完整的图像数据
-    private byte[] fullFrameData;
-    // 线程安全标志，表示是否有新的完整帧数据准备好了
-    private volatile bool isFrameReady = false;
+    // 每个通道复用同一个纹理，避免每帧创建新纹理造成内存泄漏
+    private Texture2D[] channelTextures;
 
-    // 预期的总包数
-    private int expectedPackets = 0;
+    // 每个通道预期的总包数
+    private int[] expectedPackets;
 
-    // 用于计算FPS的变量
-    private int frameCount = 0;
+    // 最近一次显示裁剪画面的时间
+    private float lastFocusFrameTime = 0f;
+
+    // 用于计算FPS的变量，每个通道分别计数
+    private int[] frameCounts;
     private float timer = 0f;
 
     void Start()
@@ -57,7 +76,22 @@ public class UDPImageReceiver : MonoBehaviour
         }
 
 
-        frameChunks = new Dictionary<int, byte[]>();
+        frameChunks = new Dictionary<int, byte[]>[CHANNEL_COUNT];
+        for (int c = 0; c < CHANNEL_COUNT; c++)
+        {
+            frameChunks[c] = new Dictionary<int, byte[]>();
+        }
+        fullFrameData = new byte[CHANNEL_COUNT][];
+        isFrameReady = new bool[CHANNEL_COUNT];
+        expectedPackets = new int[CHANNEL_COUNT];
+        channelTextures = new Texture2D[CHANNEL_COUNT];
+        frameCounts = new int[CHANNEL_COUNT];
+
+        // 裁剪画面在收到第一帧之前不显示
+        if (focusImage != null)
+        {
+            focusImage.enabled = false;
+        }
 
         SingleLineConsoleManager.Instance.ShowMessage("开始接收相机实时画面.",Color.yellow);
         receiveThread = new Thread(new ThreadStart(ReceiveData));
@@ -78,35 +112,45 @@ public class UDPImageReceiver : MonoBehaviour
             {
                 byte[] data = client.Receive(ref anyIP);
 
-                if (data == null || data.Length <= 0)
+                if (data == null || data.Length < 2)
                 {
                     continue;
                 }
 
-                // 用第一个字节作为类型分发器
+                // 用第一个字节作为类型分发器，第二个字节是通道号
                 byte packetType = data[0];
+                int channel = data[1];
+                if (channel >= CHANNEL_COUNT)
+                {
+                    continue;
+                }
+                Dictionary<int, byte[]> chunks = frameChunks[channel];
 
                 if (packetType == 0x01) // --- 开始信号 ---
                 {
-                    if (data.Length == 3)
+                    if (data.Length == 4)
                     {
-                        frameChunks.Clear();
-                        expectedPackets = (data[1] << 8) | data[2];
-                        isFrameReady = false;
+                        chunks.Clear();
+                        expectedPackets[channel] = (data[2] << 8) | data[3];
+                        lock (frameLock)
+                        {
+                            isFrameReady[channel] = false;
+                        }
                     }
                 }
                 else if (packetType == 0x02) // --- 结束信号 ---
                 {
-                    if (data.Length == 1)
+                    if (data.Length == 2)
                     {
-                        if (frameChunks.Count == expectedPackets && expectedPackets > 0)
+                        int expected = expectedPackets[channel];
+                        if (chunks.Count == expected && expected > 0)
                         {
                             List<byte> fullDataList = new List<byte>();
-                            for (int i = 0; i < expectedPackets; i++)
+                            for (int i = 0; i < expected; i++)
                             {
-                                if (frameChunks.ContainsKey(i)) // 检查键在不在字典中
+                                if (chunks.ContainsKey(i)) // 检查键在不在字典中
                                 {
-                                    fullDataList.AddRange(frameChunks[i]);
+                                    fullDataList.AddRange(chunks[i]);
                                 }
                                 else
                                 {
@@ -118,26 +162,30 @@ public class UDPImageReceiver : MonoBehaviour
 
                             if (fullDataList.Count > 0)
                             {
-                                fullFrameData = fullDataList.ToArray(); // 可变的list 变成不可变的数组
-                                isFrameReady = true;
+                                byte[] frameData = fullDataList.ToArray(); // 可变的list 变成不可变的数组
+                                lock (frameLock)
+                                {
+                                    fullFrameData[channel] = frameData;
+                                    isFrameReady[channel] = true;
+                                }
                             }
                         }
-                        frameChunks.Clear();
-                        expectedPackets = 0;
+                        chunks.Clear();
+                        expectedPackets[channel] = 0;
                     }
                 }
                 else if (packetType == 0x00) // --- 数据包 ---
                 {
-                    if (data.Length > 3) // 1字节类型 + 2字节序号
+                    if (data.Length > 4) // 1字节类型 + 1字节通道号 + 2字节序号
                     {
-                        // 包序号从第2个字节开始
-                        int packetIndex = (data[1] << 8) | data[2];
+                        // 包序号从第3个字节开始
+                        int packetIndex = (data[2] << 8) | data[3];
 
-                        // 纯数据从第4个字节开始
-                        byte[] chunkData = new byte[data.Length - 3];
-                        Array.Copy(data, 3, chunkData, 0, chunkData.Length);
+                        // 纯数据从第5个字节开始
+                        byte[] chunkData = new byte[data.Length - 4];
+                        Array.Copy(data, 4, chunkData, 0, chunkData.Length);
 
-                        frameChunks[packetIndex] = chunkData;
+                        chunks[packetIndex] = chunkData;
                     }
                 }
             }
@@ -148,31 +196,63 @@ public class UDPImageReceiver : MonoBehaviour
         }
     }
 
+    // 取出某个通道新到达的完整帧数据，没有新帧时返回null
+    private byte[] TakeFrame(int channel)
+    {
+        lock (frameLock)
+        {
+            if (!isFrameReady[channel])
+            {
+                return null;
+            }
+            // 重置标志，防止重复进行
+            isFrameReady[channel] = false;
+            return fullFrameData[channel];
+        }
+    }
+
+    // 把JPEG数据解码到该通道复用的纹理上，成功时返回true
+    private bool ShowFrame(int channel, byte[] frameData, RawImage target)
+    {
+        if (target == null || frameData == null || frameData.Length == 0)
+        {
+            return false;
+        }
+
+        if (channelTextures[channel] == null)
+        {
+            //(2, 2) 在这里只是一个无所谓的占位符，
+            //因为 LoadImage() 会立即根据 frameData 的内容重置纹理的真实尺寸。
+            //最终图像的像素分辨率（清晰度）是由 frameData 决定的。
+            //该图像在屏幕上的最终显示大小（看起来多大）是由 RawImage 的 RectTransform 决定的。
+            channelTextures[channel] = new Texture2D(2, 2);
+        }
+
+        if (!channelTextures[channel].LoadImage(frameData))
+        {
+            return false;
+        }
+        target.texture = channelTextures[channel];
+        // 成功显示一帧，计数器加1
+        frameCounts[channel]++;
+        return true;
+    }
+
     void Update()
     {
         // 只在主线程中操作Unity的UI和纹理
         // 检查后台线程是否已经准备好了一帧完整的数据
-        if (isFrameReady)
+        ShowFrame(FULL_FRAME_CHANNEL, TakeFrame(FULL_FRAME_CHANNEL), displayImage);
+        // 选中物体的高质量裁剪画面
+        if (ShowFrame(FOCUS_CHANNEL, TakeFrame(FOCUS_CHANNEL), focusImage))
         {
-            // 重置标志，防止重复进行
-            isFrameReady = false;
-            if (fullFrameData != null && fullFrameData.Length > 0)
-            {
-                // 创建一个新的纹理
-                Texture2D texture = new Texture2D(2, 2);
-                //(2, 2) 在这里只是一个无所谓的占位符，
-                //因为 LoadImage() 会立即根据 fullFrameData 的内容重置纹理的真实尺寸。
-                //最终图像的像素分辨率（清晰度）是由 fullFrameData 决定的。
-                //该图像在屏幕上的最终显示大小（看起来多大）是由 displayImage(RawImage) 的 RectTransform 决定的。
-                
-                if (texture.LoadImage(fullFrameData))
-                {
-                    // 将新纹理应用到UI上
-                    displayImage.texture = texture;
-                    // 成功显示一帧，计数器加1
-                    frameCount++;
-                }
-            }
+            lastFocusFrameTime = Time.time;
+            focusImage.enabled = true;
+        }
+        else if (focusImage != null && focusImage.enabled && Time.time - lastFocusFrameTime > focusTimeout)
+        {
+            // 一段时间没有新的裁剪画面，说明已不再选中物体，隐藏最后一帧
+            focusImage.enabled = false;
         }
 
         timer += Time.deltaTime;
@@ -180,11 +260,19 @@ public class UDPImageReceiver : MonoBehaviour
         {
             if (fpsText != null)
             {
-                fpsText.text = "FPS: " + Mathf.RoundToInt(frameCount / timer);
+                // 选中物体后完整画面会降频发送，因此分别显示两个通道的帧率
+                fpsText.text = "FPS: " + Mathf.RoundToInt(frameCounts[FULL_FRAME_CHANNEL] / timer);
+                if (frameCounts[FOCUS_CHANNEL] > 0)
+                {
+                    fpsText.text += " | Focus FPS: " + Mathf.RoundToInt(frameCounts[FOCUS_CHANNEL] / timer);
+                }
             }
             // 重置计时器和计数器
             timer = 0f;
-            frameCount = 0;
+            for (int c = 0; c < CHANNEL_COUNT; c++)
+            {
+                frameCounts[c] = 0;
+            }
         }
     }
 
@@ -199,5 +287,16 @@ public class UDPImageReceiver : MonoBehaviour
         {
             client.Close();
         }
+        // 释放复用的纹理
+        if (channelTextures != null)
+        {
+            foreach (Texture2D texture in channelTextures)
+            {
+                if (texture != null)
+                {
+                    Destroy(texture);
+                }
+            }
+        }
     }
 }
\ No newline at end of file